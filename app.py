@@ -1,9 +1,26 @@
+import functools
+import hashlib
+import html
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
 import streamlit as st
 import pandas as pd
 import numpy as np
 import joblib
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 # Page configuration
 st.set_page_config(
@@ -14,224 +31,291 @@ st.set_page_config(
 )
 
 # Custom CSS for modern styling with updated background
-st.markdown("""
-<style>
-    /* Apply modern gradient background with dark theme */
-    .stApp {
-        background: linear-gradient(135deg, #0c0c0c 0%, #1a1a2e 25%, #16213e 50%, #0f3460 75%, #1a1a2e 100%);
-        font-family: "Segoe UI", "Roboto", sans-serif;
-        color: #ffffff;
-        min-height: 100vh;
-    }
-
-    /* Alternative light modern background - uncomment to use */
-    /*
-    .stApp {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 25%, #f093fb 50%, #f5576c 75%, #4facfe 100%);
-        font-family: "Segoe UI", "Roboto", sans-serif;
-        color: #ffffff;
-        min-height: 100vh;
-    }
-    */
-
-    /* Update text colors for dark background */
-    .stMarkdown, .stText, p, span, div {
-        color: #ffffff !important;
-    }
-
-    /* Header with glassmorphism effect */
-    .main-header {
-        text-align: center;
-        padding: 1.5rem 0;
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        color: white;
-        border-radius: 20px;
-        margin-bottom: 2rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-    }
-
-    /* Info card with glassmorphism */
-    .info-card {
-        background: rgba(255, 255, 255, 0.15);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin-bottom: 1rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-        color: white;
-    }
-
-    /* Prediction result card with vibrant gradient */
-    .prediction-result {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 2rem;
-        border-radius: 25px;
-        text-align: center;
-        font-size: 1.6rem;
-        font-weight: bold;
-        margin: 1.5rem 0;
-        box-shadow: 0 10px 30px rgba(102, 126, 234, 0.4);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        transition: transform 0.3s ease-in-out;
-    }
-    .prediction-result:hover {
-        transform: translateY(-8px);
-        box-shadow: 0 15px 40px rgba(102, 126, 234, 0.6);
-    }
-
-    /* Metric cards with glassmorphism */
-    .metric-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        padding: 1.2rem;
-        border-radius: 15px;
-        text-align: center;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-        transition: all 0.3s ease-in-out;
-        color: white;
-    }
-    .metric-card:hover {
-        transform: translateY(-8px);
-        background: rgba(255, 255, 255, 0.2);
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.4);
-    }
-
-    /* Update Streamlit components for dark theme */
-    .stSelectbox > div > div {
-        background-color: rgba(255, 255, 255, 0.1) !important;
-        color: white !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-    }
-
-    /* Fix dropdown menu visibility - more aggressive approach */
-    div[data-baseweb="popover"] > div {
-        background-color: rgba(20, 25, 45, 0.98) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-        border-radius: 10px !important;
-        box-shadow: 0 10px 30px rgba(0, 0, 0, 0.7) !important;
-    }
-
-    /* Target the menu container more specifically */
-    ul[role="listbox"] {
-        background-color: rgba(20, 25, 45, 0.98) !important;
-        border-radius: 10px !important;
-        padding: 5px !important;
-    }
-
-    /* Individual dropdown options - multiple selectors */
-    ul[role="listbox"] li,
-    div[role="option"],
-    [data-baseweb="menu-item"] {
-        background-color: rgba(20, 25, 45, 0.9) !important;
-        color: white !important;
-        padding: 12px 16px !important;
-        margin: 2px 0 !important;
-        border-radius: 6px !important;
-    }
-
-    /* Hover states */
-    ul[role="listbox"] li:hover,
-    div[role="option"]:hover,
-    [data-baseweb="menu-item"]:hover {
-        background-color: rgba(102, 126, 234, 0.6) !important;
-        color: white !important;
-    }
-
-    /* Selected/focused states */
-    ul[role="listbox"] li[aria-selected="true"],
-    div[role="option"][aria-selected="true"],
-    [data-baseweb="menu-item"][aria-selected="true"] {
-        background-color: rgba(102, 126, 234, 0.8) !important;
-        color: white !important;
-    }
-
-    /* Override any white backgrounds */
-    .stSelectbox div[style*="background-color"] {
-        background-color: rgba(20, 25, 45, 0.95) !important;
-    }
-
-    /* Force override for stubborn elements */
-    *[style*="background: white"],
-    * [style*="background-color: white"],
-    * [style*="background: rgb(255, 255, 255)"] {
-        background-color: rgba(20, 25, 45, 0.95) !important;
-        color: white !important;
-    }
-
-    .stSlider > div > div > div {
-        color: white !important;
-    }
-
-    .stNumberInput > div > div > input {
-        background-color: rgba(255, 255, 255, 0.1) !important;
-        color: white !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-    }
-
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 15px !important;
-        padding: 0.8rem 2rem !important;
-        font-weight: bold !important;
-        transition: all 0.3s ease-in-out !important;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-3px) !important;
-        box-shadow: 0 10px 25px rgba(102, 126, 234, 0.5) !important;
-    }
-
-    /* Sidebar styling */
-    .css-1d391kg {
-        background: rgba(0, 0, 0, 0.3) !important;
-    }
-
-    /* Footer */
-    .footer {
-        text-align: center;
-        color: #cccccc;
-        padding: 1rem;
-        margin-top: 2rem;
-        font-size: 0.9rem;
-    }
-
-    /* Subheaders */
-    .stSubheader {
-        color: white !important;
-    }
-
-    /* Info and success boxes */
-    .stInfo, .stSuccess {
-        background: rgba(255, 255, 255, 0.1) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        color: white !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-
-# Load model and pipeline
-@st.cache_resource
+# Streamlit drops any element a rerun does not re-emit, so the stylesheet has to be
+# sent on every run; minify it once to keep that payload small
+@st.cache_data
+def load_css():
+    with open("style.css") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+
+# SHA-256 of a model file, computed once per process; None when the file is missing
+@st.cache_resource(show_spinner=False)
+def file_digest(name):
+    if not os.path.exists(name):
+        return None
+    digest = hashlib.sha256()
+    with open(name, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Optional ONNX Runtime session for the estimator (see export_onnx.py). It is only
+# used when the hash of model.pkl recorded at export time matches the current
+# model.pkl, so a retrained model is never shadowed by a stale export.
+@st.cache_resource(show_spinner=False)
+def load_onnx_session():
+    if ort is None or not os.path.exists("model.onnx"):
+        return None
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession("model.onnx", sess_options=options, providers=["CPUExecutionProvider"])
+    exported_from = session.get_modelmeta().custom_metadata_map.get("model_pkl_sha256")
+    if exported_from is None or exported_from != file_digest("model.pkl"):
+        logging.getLogger(__name__).warning(
+            "model.onnx was not exported from the current model.pkl; using model.pkl. "
+            "Rerun export_onnx.py to refresh it."
+        )
+        return None
+    return session
+
+# Load model and pipeline. When model.onnx serves predictions only the pipeline is
+# needed, so the estimator is not deserialized and None is returned in its place.
+@st.cache_resource(show_spinner=False)
 def load_models():
+    load_model = load_onnx_session() is None
     try:
-        model = joblib.load("model.pkl")
-        pipeline = joblib.load("pipeline.pkl")
-        return model, pipeline
+        # Deserialize both files concurrently; mmap_mode maps plain ndarray
+        # attributes (e.g. scaler means/scales) from disk instead of copying them,
+        # so those pages are shared through the OS page cache. sklearn tree
+        # ensembles gain nothing: Tree.__setstate__ copies the node and value
+        # arrays into private memory. Mapping also only applies to uncompressed
+        # dumps (joblib.dump's default compress=0); for compressed files joblib
+        # warns and loads into memory as before.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            model_future = executor.submit(joblib.load, "model.pkl", mmap_mode="r") if load_model else None
+            pipeline_future = executor.submit(joblib.load, "pipeline.pkl", mmap_mode="r")
+            model = model_future.result() if model_future is not None else None
+            return model, pipeline_future.result()
     except FileNotFoundError:
         st.error("⚠️ Model files not found. Please ensure 'model.pkl' and 'pipeline.pkl' are in the same directory.")
         st.stop()
 
-model, pipeline = load_models()
+# Single-row input frame with the column order and dtypes the pipeline was fitted on
+INPUT_COLUMNS = {
+    "longitude": "float64",
+    "latitude": "float64",
+    "housing_median_age": "float64",
+    "total_rooms": "float64",
+    "total_bedrooms": "float64",
+    "population": "float64",
+    "households": "float64",
+    "median_income": "float64",
+    "ocean_proximity": "object"
+}
+INPUT_TEMPLATE = pd.DataFrame({
+    col: pd.Series([0], dtype=dtype) for col, dtype in INPUT_COLUMNS.items()
+})
+
+NUMERIC_COLUMNS = [col for col, dtype in INPUT_COLUMNS.items() if dtype == "float64"]
+
+# Widget options and (min, max, default, step) ranges
+OCEAN_PROXIMITY_OPTIONS = ("<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN")
+LONGITUDE_RANGE = (-125.0, -114.0, -118.0, 0.01)
+LATITUDE_RANGE = (32.0, 42.0, 34.0, 0.01)
+HOUSING_MEDIAN_AGE_RANGE = (1, 52, 20, 1)
+TOTAL_ROOMS_RANGE = (1, 20000, 2000, 100)
+POPULATION_RANGE = (1, 20000, 1000, 50)
+HOUSEHOLDS_RANGE = (1, 5000, 400, 25)
+MEDIAN_INCOME_RANGE = (0.5, 15.0, 3.5, 0.1)
+TOTAL_BEDROOMS_RANGE = (1, 5000, 500, 25)
+
+# Single-row replacement for pipeline.transform. The numeric block is rebuilt from
+# the fitted scaler, and the encoded ocean_proximity block is looked up from a table
+# produced by running the pipeline once per option. None when the pipeline is not
+# a scaled-numeric + ocean_proximity ColumnTransformer, in which case the full
+# pipeline is used instead.
+@st.cache_resource(show_spinner=False)
+def load_fast_transform():
+    _, pipeline = load_models()
+    if not isinstance(pipeline, ColumnTransformer):
+        return None
+    fitted = [(transformer, list(cols)) for _, transformer, cols in pipeline.transformers_ if transformer != "drop"]
+    if len(fitted) != 2:
+        return None
+    (scaler, num_cols), (_, cat_cols) = fitted
+    if isinstance(scaler, Pipeline):
+        # Inputs are never missing, so an imputer step is a no-op here unless it
+        # appends missing-value indicator columns
+        if any(isinstance(step, SimpleImputer) and step.add_indicator for _, step in scaler.steps):
+            return None
+        steps = [step for _, step in scaler.steps if not isinstance(step, SimpleImputer)]
+        scaler = steps[0] if len(steps) == 1 else None
+    if not (isinstance(scaler, StandardScaler) and num_cols == NUMERIC_COLUMNS and cat_cols == ["ocean_proximity"]):
+        return None
+    # The scaler must see exactly the numeric input columns, one statistic each
+    if scaler.n_features_in_ != len(num_cols) or (scaler.mean_ is not None and scaler.mean_.shape != (len(num_cols),)):
+        return None
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(len(num_cols))
+    scale = scaler.scale_ if scaler.with_std else np.ones(len(num_cols))
+
+    option_rows = pd.DataFrame({col: [0.0] * len(OCEAN_PROXIMITY_OPTIONS) for col in NUMERIC_COLUMNS})
+    option_rows["ocean_proximity"] = OCEAN_PROXIMITY_OPTIONS
+    try:
+        encoded = pipeline.transform(option_rows)
+    except ValueError:
+        return None
+    if hasattr(encoded, "toarray"):
+        encoded = encoded.toarray()
+    encoded = np.asarray(encoded, dtype=np.float64)
+    # The option rows have all-zero numerics, so the pipeline's own output must start
+    # with exactly what the NumPy path computes for them; otherwise the layout is not
+    # [scaled numerics, encoded ocean_proximity] and the fast path would diverge
+    n_num = len(num_cols)
+    if encoded.shape[1] <= n_num or not np.array_equal(
+        encoded[:, :n_num], np.broadcast_to((0.0 - mean) / scale, (len(OCEAN_PROXIMITY_OPTIONS), n_num))
+    ):
+        return None
+    ocean_suffix = dict(zip(OCEAN_PROXIMITY_OPTIONS, encoded[:, n_num:]))
+    return mean, scale, ocean_suffix
+
+# On-disk prediction cache; keys pack the step-rounded inputs with the index of
+# the ocean proximity option
+PREDICTION_CACHE_PATH = "predict_cache.db"
+PREDICTION_KEY_FORMAT = "<ddiiiiidB"
+
+# Metric card markup, filled in per prediction
+METRIC_CARD_TEMPLATE = '<div class="metric-card"><h4>{label}</h4><h3>{value}</h3></div>'
+
+def transform_row(longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+                  population, households, median_income, ocean_proximity):
+    fast_transform = load_fast_transform()
+    if fast_transform is not None:
+        mean, scale, ocean_suffix = fast_transform
+        numeric = np.array([
+            longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+            population, households, median_income
+        ], dtype=np.float64)
+        return np.concatenate([(numeric - mean) / scale, ocean_suffix[ocean_proximity]]).reshape(1, -1)
+
+    _, pipeline = load_models()
+    # Filling a copy of the typed template cell by cell skips the dtype inference of
+    # building a DataFrame from a dict, and leaves the shared template untouched
+    input_df = INPUT_TEMPLATE.copy()
+    values = (
+        longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+        population, households, median_income, ocean_proximity
+    )
+    for column, value in zip(INPUT_COLUMNS, values):
+        input_df.at[0, column] = value
+    transformed_input = pipeline.transform(input_df)
+    if hasattr(transformed_input, "toarray"):
+        transformed_input = transformed_input.toarray()
+    return np.asarray(transformed_input, dtype=np.float64)
+
+
+def run_model(transformed_input):
+    # Tree estimators and ONNX Runtime both work in float32 internally
+    transformed_input = transformed_input.astype(np.float32, copy=False)
+    session = load_onnx_session()
+    if session is not None:
+        input_name = session.get_inputs()[0].name
+        return float(session.run(None, {input_name: transformed_input})[0].ravel()[0])
+    model, _ = load_models()
+    return float(model.predict(transformed_input)[0])
+
+
+# Persistent prediction cache shared by every session and kept across restarts.
+# Rows are keyed by a content hash of the model files as well as the inputs, so
+# replicas running different models never read each other's predictions. Rows
+# left by other models are pruned when the connection opens, so the file does not
+# grow with every retrain. None when the database cannot be opened.
+@st.cache_resource(show_spinner=False)
+def load_disk_cache():
+    signature = hashlib.sha256(";".join(
+        f"{name}:{file_digest(name)}" for name in ("model.pkl", "pipeline.pkl", "model.onnx")
+    ).encode()).hexdigest()
+    try:
+        conn = sqlite3.connect(PREDICTION_CACHE_PATH, check_same_thread=False)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(signature TEXT, key BLOB, value REAL, PRIMARY KEY (signature, key))"
+            )
+            conn.execute("DELETE FROM predictions WHERE signature != ?", (signature,))
+    except sqlite3.Error:
+        return None
+    # One connection serves all session threads, so access to it is serialized
+    return conn, threading.Lock(), signature
+
+
+def predict_uncached(longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+                     population, households, median_income, ocean_proximity):
+    disk_cache = load_disk_cache()
+    if disk_cache is not None:
+        conn, lock, signature = disk_cache
+        key = struct.pack(
+            PREDICTION_KEY_FORMAT, longitude, latitude, housing_median_age, total_rooms,
+            total_bedrooms, population, households, median_income,
+            OCEAN_PROXIMITY_OPTIONS.index(ocean_proximity)
+        )
+        try:
+            with lock:
+                row = conn.execute(
+                    "SELECT value FROM predictions WHERE signature = ? AND key = ?", (signature, key)
+                ).fetchone()
+        except sqlite3.Error:
+            # A locked or damaged database counts as a miss; the model still answers
+            row = None
+        if row is not None:
+            return row[0]
+
+    transformed_input = transform_row(
+        longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+        population, households, median_income, ocean_proximity
+    )
+    predicted_value = run_model(transformed_input)
+
+    if disk_cache is not None:
+        try:
+            with lock, conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO predictions VALUES (?, ?, ?)", (signature, key, predicted_value)
+                )
+        except sqlite3.Error:
+            # Another replica may hold the write lock; the value is still returned
+            pass
+    return predicted_value
+
+
+# Process-wide memo of predictions; cheaper per hit than st.cache_data since nothing
+# is pickled. Streamlit re-executes this script on every rerun, so a module-level
+# lru_cache would start empty each time; one wrapper is kept per process instead.
+@st.cache_resource(show_spinner=False)
+def load_prediction_cache():
+    return functools.lru_cache(maxsize=4096)(predict_uncached)
+
+
+def predict_price(longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+                  population, households, median_income, ocean_proximity):
+    # Snap the inputs to the widget steps so equal settings share one cache key
+    return load_prediction_cache()(
+        round(longitude, 2), round(latitude, 2), int(housing_median_age), int(total_rooms),
+        int(total_bedrooms), int(population), int(households), round(median_income, 1),
+        ocean_proximity
+    )
+
+
+# Load up front so missing model files are reported before the inputs are drawn,
+# and so the model-file hashes behind the disk cache are not paid on the first click
+load_models()
+load_disk_cache()
+
+
+def derived_metrics(predicted_value, total_rooms, total_bedrooms, median_income, population):
+    return (
+        predicted_value / total_rooms,
+        predicted_value / total_bedrooms,
+        predicted_value / (median_income * 10000),
+        predicted_value / population
+    )
+
 
 # Header
 st.markdown("""
@@ -251,186 +335,138 @@ with st.container():
     </div>
     """, unsafe_allow_html=True)
 
-# Main layout with columns
-col1, col2 = st.columns([1, 1])
-
-with col1:
-    st.subheader(" Location Parameters")
+# The form and its results run as a fragment, so submitting reruns only this block
+# rather than the whole page (stylesheet, header and info card included)
+@st.fragment
+def predict_block():
+    # Inputs are batched in a form so nothing reruns until the user submits
+    with st.form("predict_form", border=False):
+        # Main layout with columns
+        col1, col2 = st.columns([1, 1])
+
+        with col1:
+            st.subheader(" Location Parameters")
     
-    # Location inputs with better formatting
-    longitude = st.slider(
-        "Longitude", 
-        min_value=-125.0, 
-        max_value=-114.0, 
-        value=-118.0, 
-        step=0.01,
-        help="Geographic longitude coordinate"
-    )
+            # Location inputs with better formatting
+            longitude = st.slider(
+                "Longitude", 
+                *LONGITUDE_RANGE,
+                help="Geographic longitude coordinate"
+            )
     
-    latitude = st.slider(
-        "Latitude", 
-        min_value=32.0, 
-        max_value=42.0, 
-        value=34.0, 
-        step=0.01,
-        help="Geographic latitude coordinate"
-    )
+            latitude = st.slider(
+                "Latitude", 
+                *LATITUDE_RANGE,
+                help="Geographic latitude coordinate"
+            )
     
-    ocean_proximity = st.selectbox(
-        "Ocean Proximity", 
-        ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"],
-        help="Proximity to ocean or bay"
-    )
+            ocean_proximity = st.selectbox(
+                "Ocean Proximity", 
+                OCEAN_PROXIMITY_OPTIONS,
+                help="Proximity to ocean or bay"
+            )
     
-    st.subheader(" Housing Characteristics")
+            st.subheader(" Housing Characteristics")
     
-    housing_median_age = st.slider(
-        "Median Age of Houses", 
-        min_value=1, 
-        max_value=52, 
-        value=20,
-        help="Median age of houses in the block"
-    )
+            housing_median_age = st.slider(
+                "Median Age of Houses", 
+                *HOUSING_MEDIAN_AGE_RANGE,
+                help="Median age of houses in the block"
+            )
     
-    total_rooms = st.number_input(
-        "Total Rooms", 
-        min_value=1, 
-        max_value=20000, 
-        value=2000,
-        step=100,
-        help="Total number of rooms in the block"
-    )
-
-with col2:
-    st.subheader(" Demographics")
+            total_rooms = st.number_input(
+                "Total Rooms", 
+                *TOTAL_ROOMS_RANGE,
+                help="Total number of rooms in the block"
+            )
+
+        with col2:
+            st.subheader(" Demographics")
     
-    population = st.number_input(
-        "Population", 
-        min_value=1, 
-        max_value=20000, 
-        value=1000,
-        step=50,
-        help="Total population in the block"
-    )
+            population = st.number_input(
+                "Population", 
+                *POPULATION_RANGE,
+                help="Total population in the block"
+            )
     
-    households = st.number_input(
-        "Households", 
-        min_value=1, 
-        max_value=5000, 
-        value=400,
-        step=25,
-        help="Number of households in the block"
-    )
+            households = st.number_input(
+                "Households", 
+                *HOUSEHOLDS_RANGE,
+                help="Number of households in the block"
+            )
     
-    median_income = st.slider(
-        "Median Income (in $10k)", 
-        min_value=0.5, 
-        max_value=15.0, 
-        value=3.5, 
-        step=0.1,
-        help="Median household income (in tens of thousands of dollars)"
-    )
+            median_income = st.slider(
+                "Median Income (in $10k)", 
+                *MEDIAN_INCOME_RANGE,
+                help="Median household income (in tens of thousands of dollars)"
+            )
     
-    st.subheader(" Room Details")
+            st.subheader(" Room Details")
     
-    total_bedrooms = st.number_input(
-        "Total Bedrooms", 
-        min_value=1, 
-        max_value=5000, 
-        value=500,
-        step=25,
-        help="Total number of bedrooms in the block"
-    )
-
-# Prediction section
-st.markdown("---")
-
-# Center the predict button
-col_center = st.columns([1, 2, 1])
-with col_center[1]:
-    predict_button = st.button(" Predict House Value", type="primary", use_container_width=True)
-
-if predict_button:
-    with st.spinner("Analyzing housing data..."):
-        # Create input dataframe
-        input_df = pd.DataFrame([{
-            "longitude": longitude,
-            "latitude": latitude,
-            "housing_median_age": housing_median_age,
-            "total_rooms": total_rooms,
-            "total_bedrooms": total_bedrooms,
-            "population": population,
-            "households": households,
-            "median_income": median_income,
-            "ocean_proximity": ocean_proximity
-        }])
-
-        # Make prediction
-        try:
-            transformed_input = pipeline.transform(input_df)
-            prediction = model.predict(transformed_input)
-            predicted_value = prediction[0]
-            
-            # Display result with modern styling
-            st.markdown(f"""
-            <div class="prediction-result">
-                 Estimated Median House Value<br>
-                <span style="font-size: 2.5rem;">${predicted_value:,.0f}</span>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Additional metrics
-            col1, col2, col3, col4 = st.columns(4)
+            total_bedrooms = st.number_input(
+                "Total Bedrooms", 
+                *TOTAL_BEDROOMS_RANGE,
+                help="Total number of bedrooms in the block"
+            )
+
+        # Prediction section
+        st.markdown("---")
+
+        # Center the predict button
+        col_center = st.columns([1, 2, 1])
+        with col_center[1]:
+            submitted = st.form_submit_button(" Predict House Value", type="primary", use_container_width=True)
+
+    if submitted:
+        with st.spinner("Analyzing housing data..."):
+            # Make prediction (cached on the input values)
+            try:
+                predicted_value = predict_price(
+                    longitude, latitude, housing_median_age, total_rooms, total_bedrooms,
+                    population, households, median_income, ocean_proximity
+                )
             
-            with col1:
+                # Display result with modern styling
                 st.markdown(f"""
-                <div class="metric-card">
-                    <h4>Price per Room</h4>
-                    <h3>${predicted_value/total_rooms:.0f}</h3>
+                <div class="prediction-result">
+                     Estimated Median House Value<br>
+                    <span style="font-size: 2.5rem;">${predicted_value:,.0f}</span>
                 </div>
                 """, unsafe_allow_html=True)
             
-            with col2:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h4>Price per Bedroom</h4>
-                    <h3>${predicted_value/total_bedrooms:.0f}</h3>
-                </div>
-                """, unsafe_allow_html=True)
+                # Additional metrics
+                price_per_room, price_per_bedroom, income_ratio, price_per_person = derived_metrics(
+                    predicted_value, total_rooms, total_bedrooms, median_income, population
+                )
+                metric_cards = [
+                    ("Price per Room", f"${price_per_room:.0f}"),
+                    ("Price per Bedroom", f"${price_per_bedroom:.0f}"),
+                    ("Price-to-Income", f"{income_ratio:.1f}x"),
+                    ("Price per Person", f"${price_per_person:.0f}")
+                ]
+                st.markdown(
+                    '<div class="metric-grid">'
+                    + "".join(METRIC_CARD_TEMPLATE.format(label=label, value=value) for label, value in metric_cards)
+                    + "</div>",
+                    unsafe_allow_html=True
+                )
             
-            with col3:
-                income_ratio = predicted_value / (median_income * 10000)
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h4>Price-to-Income</h4>
-                    <h3>{income_ratio:.1f}x</h3>
-                </div>
-                """, unsafe_allow_html=True)
+                # Feature importance visualization (if available)
+                st.subheader(" Key Insights")
             
-            with col4:
-                price_per_person = predicted_value / population
                 st.markdown(f"""
-                <div class="metric-card">
-                    <h4>Price per Person</h4>
-                    <h3>${price_per_person:.0f}</h3>
+                <div class="info-card insight-grid">
+                    <p><strong>Ocean Proximity</strong>: {html.escape(ocean_proximity)}</p>
+                    <p><strong>Housing Age</strong>: {housing_median_age} years (median)</p>
+                    <p><strong>Income Level</strong>: ${median_income * 10:.0f}k (median)</p>
+                    <p><strong>Population Density</strong>: {population/households:.1f} people/household</p>
                 </div>
                 """, unsafe_allow_html=True)
-            
-            # Feature importance visualization (if available)
-            st.subheader(" Key Insights")
-            
-            insights_col1, insights_col2 = st.columns(2)
-            
-            with insights_col1:
-                st.info(f" **Ocean Proximity**: {ocean_proximity}")
-                st.info(f" **Income Level**: ${median_income * 10:.0f}k (median)")
                 
-            with insights_col2:
-                st.info(f" **Housing Age**: {housing_median_age} years (median)")
-                st.info(f" **Population Density**: {population/households:.1f} people/household")
-                
-        except Exception as e:
-            st.error(f"❌ Prediction failed: {str(e)}")
+            except Exception as e:
+                st.error(f"❌ Prediction failed: {str(e)}")
+
+predict_block()
 
 # Footer
 st.markdown("---")
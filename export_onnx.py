@@ -0,0 +1,29 @@
+# Convert the fitted estimator in model.pkl to model.onnx for onnxruntime inference.
+# Requires skl2onnx (offline only); app.py picks model.onnx up automatically when
+# onnxruntime is installed and falls back to model.pkl otherwise. The SHA-256 of
+# model.pkl is stored in the ONNX metadata so the app can ignore a stale export
+# after the model is retrained.
+import hashlib
+
+import joblib
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+digest = hashlib.sha256()
+with open("model.pkl", "rb") as f:
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+        digest.update(chunk)
+
+model = joblib.load("model.pkl")
+onx = convert_sklearn(
+    model,
+    initial_types=[("input", FloatTensorType([None, model.n_features_in_]))]
+)
+entry = onx.metadata_props.add()
+entry.key = "model_pkl_sha256"
+entry.value = digest.hexdigest()
+
+with open("model.onnx", "wb") as f:
+    f.write(onx.SerializeToString())
+
+print(f"Wrote model.onnx ({model.n_features_in_} input features)")